@@ -1,5 +1,3 @@
-import os
-import runpy
 import sys
 from pathlib import Path
 
@@ -11,4 +9,6 @@ if src_path not in sys.path:
 
 # Delegate to package entry (keeps single source of truth)
 if __name__ == "__main__":
-    runpy.run_module("escargot_review_bot.main", run_name="__main__")
\ No newline at end of file
+    from escargot_review_bot.main import main
+
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+def make_review_cache_key(
+    pass_type: str,
+    model: str,
+    prompt_version: str,
+    chain_input: Dict[str, Any],
+) -> str:
+    """Build a cache key from the pass, model, prompt version and hunk input.
+
+    The hunk part hashes every chain input variable (file path, hunk text and
+    commentable catalog), so a key only matches when the LLM would receive the
+    exact same prompt.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(chain_input):
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(chain_input[name]).encode("utf-8"))
+        digest.update(b"\0")
+    return f"{pass_type}:{model}:{prompt_version}:{digest.hexdigest()}"
+
+
+class LRUCache(Generic[T]):
+    """Thread-safe in-process LRU cache with per-entry TTL.
+
+    Used to skip LLM calls for hunks already reviewed with the same prompt and
+    model (e.g. CI re-runs of an unchanged PR) and to keep normalized HEAD
+    blobs across requests. A `ttl_seconds` or `max_entries` of 0 disables the
+    cache; `float("inf")` keeps entries until they are evicted.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[T]:
+        """Return the cached value for `key`, or None if absent or expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: T) -> None:
+        """Store `value` under `key`, evicting the least recently used entries."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
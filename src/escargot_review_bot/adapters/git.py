@@ -1,5 +1,7 @@
+import atexit
 import subprocess
-from typing import List
+import threading
+from typing import List, Optional
 
 from fastapi import HTTPException
 
@@ -10,18 +12,162 @@ from escargot_review_bot.config.logging import get_logger
 logger = get_logger("review-bot.git")
 
 
-def run_git_command(command: List[str]) -> str:
-    """Run a git subcommand in `REPO_PATH` and return its stdout as text.
+def run_git_command(command: List[str]) -> bytes:
+    """Run a git subcommand in `REPO_PATH` and return its raw stdout bytes.
 
-    Raises HTTPException(500) on failure so API callers receive a clear error.
+    Output is not decoded here; callers that need text decode once with
+    `.decode("utf-8", "replace")`. Raises HTTPException(500) on failure so API
+    callers receive a clear error.
     """
     try:
         # Log command for traceability
-        logger.debug(f"GIT exec: git {' '.join(command)} (cwd={REPO_PATH})")
-        out = subprocess.check_output(["git"] + command, cwd=REPO_PATH, text=True)
-        logger.debug(f"GIT ok: len={len(out)}")
+        logger.debug("GIT exec: git %s (cwd=%s)", " ".join(command), REPO_PATH)
+        out = subprocess.check_output(["git"] + command, cwd=REPO_PATH)
+        logger.debug("GIT ok: len=%d", len(out))
         return out
     except subprocess.CalledProcessError as e:
         # Map git failures to HTTP 500 for upstream handlers
         logger.error(f"GIT command failed: git {' '.join(command)} -> {e}")
-        raise HTTPException(status_code=500, detail="An internal Git command failed.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="An internal Git command failed.")
+
+
+def find_missing_objects(names: List[str]) -> List[str]:
+    """Return the subset of `names` (e.g. `<sha>^{commit}`) that do not resolve locally.
+
+    Checks every name with a single `git cat-file --batch-check` process
+    instead of one `git cat-file -e` per name. Raises HTTPException(500) if the
+    check itself fails.
+    """
+    if not names:
+        return []
+    payload = "".join(f"{name}\n" for name in names).encode("utf-8")
+    try:
+        logger.debug("GIT exec: git cat-file --batch-check (%d object(s))", len(names))
+        out = subprocess.run(
+            ["git", "cat-file", "--batch-check"],
+            cwd=REPO_PATH,
+            input=payload,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.error(f"GIT command failed: git cat-file --batch-check -> {e}")
+        raise HTTPException(status_code=500, detail="An internal Git command failed.")
+    # One "<oid> <type> <size>" or "<name> missing" line per input, in order
+    return [
+        name for name, line in zip(names, out.splitlines())
+        if line.endswith((b" missing", b" ambiguous"))
+    ]
+
+
+class _GitBatch:
+    """Long-lived `git cat-file --batch` process for object reads.
+
+    Avoids a fork/exec of `git show` per blob: object names are written to the
+    process stdin and `<oid> <type> <size>` headers plus payloads are read back
+    from stdout. Requests are serialized with a lock so review worker threads
+    can share one process; a dead process is restarted on the next read.
+    """
+
+    def __init__(self) -> None:
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            logger.debug("GIT batch start: git cat-file --batch (cwd=%s)", REPO_PATH)
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=REPO_PATH,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def read_objects(self, names: List[str]) -> List[Optional[bytes]]:
+        """Return the contents of all `names` in order; None for missing objects.
+
+        Requests are pipelined: a writer thread feeds every name to stdin while
+        the payloads are read back, so git never waits on a round-trip per blob.
+        """
+        if not names:
+            return []
+        with self._lock:
+            try:
+                proc = self._ensure_started()
+                payload = b"".join(name.encode("utf-8") + b"\n" for name in names)
+                writer = threading.Thread(target=self._write_all, args=(proc, payload), daemon=True)
+                writer.start()
+                out: List[Optional[bytes]] = []
+                for name in names:
+                    header = proc.stdout.readline()
+                    if not header:
+                        raise OSError("git cat-file --batch exited unexpectedly")
+                    if header.endswith((b" missing\n", b" ambiguous\n")):
+                        logger.debug("GIT batch: object not found: %s", name)
+                        out.append(None)
+                        continue
+                    size = int(header.split()[-1])
+                    out.append(proc.stdout.read(size))
+                    proc.stdout.read(1)  # trailing LF after each payload
+                writer.join()
+                logger.debug("GIT batch ok: %d object(s)", len(names))
+                return out
+            except (OSError, ValueError) as e:
+                # Killing the process also unblocks the writer thread with a broken pipe
+                logger.error(f"GIT batch read failed: {len(names)} object(s) -> {e}")
+                self._close_locked()
+                raise HTTPException(status_code=500, detail="An internal Git command failed.")
+
+    @staticmethod
+    def _write_all(proc: subprocess.Popen, payload: bytes) -> None:
+        try:
+            proc.stdin.write(payload)
+            proc.stdin.flush()
+        except (OSError, ValueError):
+            # Reader side notices the dead process and reports the failure
+            pass
+
+    def _close_locked(self) -> None:
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+                self._proc.wait()
+            except Exception:
+                pass
+            self._proc = None
+
+    def close(self) -> None:
+        """Terminate the batch process if running."""
+        with self._lock:
+            self._close_locked()
+
+
+_git_batch = _GitBatch()
+atexit.register(_git_batch.close)
+
+
+def read_blob(sha: str, path: str) -> bytes:
+    """Return the contents of `path` at commit `sha` via the shared batch process.
+
+    Equivalent to `git show {sha}:{path}` without spawning a process per call.
+    Raises HTTPException(500) when the object cannot be read.
+    """
+    name = f"{sha}:{path}"
+    data = _git_batch.read_objects([name])[0]
+    if data is None:
+        logger.error(f"GIT batch: object not found: {name}")
+        raise HTTPException(status_code=500, detail="An internal Git command failed.")
+    return data
+
+
+def read_blobs(sha: str, paths: List[str]) -> List[Optional[bytes]]:
+    """Return the contents of each of `paths` at commit `sha`, in order.
+
+    All reads are pipelined through the shared batch process in one round;
+    paths missing at `sha` yield None. Raises HTTPException(500) if the batch
+    process fails.
+    """
+    return _git_batch.read_objects([f"{sha}:{path}" for path in paths])
@@ -1,8 +1,14 @@
-import json
+import contextlib
+import logging
 import re
 import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback keeps `loads` available
+    import json as orjson
 
 import ollama
 from langchain_ollama import ChatOllama
@@ -10,6 +16,7 @@ from langchain_core.runnables import RunnableSerializable
 
 from escargot_review_bot.config.config import (
     MODEL_NAME,
+    OLLAMA_HOST,
     OLLAMA_KEEP_ALIVE,
     OLLAMA_MAX_RETRIES,
     OLLAMA_NUM_BATCH,
@@ -20,6 +27,7 @@ from escargot_review_bot.config.config import (
     INTER_REQUEST_DELAY_SECONDS,
 )
 from escargot_review_bot.config.logging import get_logger
+from escargot_review_bot.domain.schemas import LLMReviewComment, LLMReviewCommentListAdapter
 
 
 logger = get_logger("review-bot.llm")
@@ -56,6 +64,10 @@ def get_chat_ollama(
     )
 
 
+_ollama_client = ollama.Client(host=OLLAMA_HOST, timeout=OLLAMA_TIMEOUT_SECONDS)
+"""Shared Ollama client; its pooled HTTP connection is reused across chat calls."""
+
+
 _llm_cache: Dict[str, ChatOllama] = {}
 
 
@@ -71,7 +83,7 @@ def get_cached_llm(model: str) -> ChatOllama:
         Cached or newly created ChatOllama instance.
     """
     if model not in _llm_cache:
-        logger.debug(f"Creating new ChatOllama instance for model={model}")
+        logger.debug("Creating new ChatOllama instance for model=%s", model)
         _llm_cache[model] = get_chat_ollama(model=model)
     return _llm_cache[model]
 
@@ -83,45 +95,141 @@ def clear_llm_cache() -> None:
 
 
 JSON_ARRAY_RE = re.compile(r"\[[\s\S]*?\]")
+FENCED_JSON_RE = re.compile(r"```json\s*([\s\S]*?)\s*```", re.IGNORECASE)
 
 
 class OllamaTimeoutError(Exception):
     """Raised when an Ollama API call exceeds the configured timeout."""
 
 
-def _find_complete_json_array_span(s: str) -> Optional[tuple]:
-    """Find the start/end indices of the first complete JSON array in `s`.
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_LBRACKET = ord("[")
+_RBRACKET = ord("]")
+_LBRACE = ord("{")
+_RBRACE = ord("}")
+# Only these bytes change scanner state; the regex engine skips everything else in C
+_JSON_STRUCT_RE = re.compile(rb'["\\\[\]{}]')
+
+
+# Text allowed before the outer `[` (after stripping whitespace): nothing, or an opening fence
+_ARRAY_LEADERS = (b"", b"```", b"```json")
+
+
+# Upper bound on buffered output (~4x the context window at ~4 bytes/token)
+_MAX_STREAM_BYTES = 4 * OLLAMA_NUM_CTX * 4
+# Text read after the JSON array closes before the stream is cut (closing fence, stray note)
+_MAX_DRAIN_CHARS = 512
 
-    Tracks string escapes and bracket depth so nested arrays are supported.
-    Returns (start, end) inclusive indices, or None if no complete array exists.
+
+class ArrayStreamParser:
+    """Incremental parser for a streamed top-level JSON array of objects.
+
+    Chunks are appended to a single `bytearray`, but each `feed()` scans only
+    the new chunk, carrying string/escape and nesting state across chunks, so
+    per-chunk cost is O(len(chunk)) rather than O(len(buffer)). The scan visits
+    only structural bytes found by `_JSON_STRUCT_RE`, so plain string content
+    never reaches the Python-level loop. Every object directly inside the
+    outer `[...]` is decoded as soon as its braces balance and appended to
+    `objs`; `done` flips to True once the outer array closes.
+
+    The outer `[` is only accepted when nothing but whitespace or an opening
+    ```` ```json ```` fence precedes it. Any other preamble (prose such as
+    "Checking `buf[0]` first.") sets `rejected` and stops scanning, as does an
+    outer span that yields no object and is not a JSON list: `done` then never
+    flips, and callers fall back to `sanitize_llm_output` on the full text,
+    which prefers fenced blocks.
     """
-    if not s:
-        return None
-    start = s.find("[")
-    if start == -1:
-        return None
-    in_str = False
-    esc = False
-    depth = 0
-    for i in range(start, len(s)):
-        ch = s[i]
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == "\\":
-                esc = True
-            elif ch == '"':
-                in_str = False
-            continue
-        if ch == '"':
-            in_str = True
-        elif ch == '[':
-            depth += 1
-        elif ch == ']':
-            depth -= 1
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.depth = 0
+        self.in_str = False
+        self.skip_at = -1  # absolute index of an escaped byte to ignore
+        self.obj_start = -1
+        self.arr_start = -1  # absolute index of the current outer `[`
+        self.arr_end = -1  # absolute index of the closing `]` once done
+        self.objs: List[Dict[str, Any]] = []
+        self.done = False
+        self.rejected = False
+
+    def feed(self, content: str) -> bool:
+        """Append a streamed chunk and return True once the outer array is closed."""
+        if self.done:
+            return True
+        data = content.encode("utf-8")
+        base = len(self.buf)
+        self.buf.extend(data)
+        if self.rejected:
+            return False
+        depth = self.depth
+        in_str = self.in_str
+        skip_at = self.skip_at
+        for m in _JSON_STRUCT_RE.finditer(data):
+            i = base + m.start()
+            if i == skip_at:
+                continue
+            ch = data[m.start()]
             if depth == 0:
-                return (start, i)
-    return None
+                # Still looking for the opening bracket of the outer array
+                if ch == _LBRACKET:
+                    if bytes(self.buf[:i]).strip().lower() not in _ARRAY_LEADERS:
+                        # Preamble text before the bracket: leave it to the fallback
+                        self.rejected = True
+                        break
+                    depth = 1
+                    self.arr_start = i
+                continue
+            if in_str:
+                if ch == _BACKSLASH:
+                    skip_at = i + 1
+                elif ch == _QUOTE:
+                    in_str = False
+                continue
+            if ch == _QUOTE:
+                in_str = True
+            elif ch == _LBRACE or ch == _LBRACKET:
+                if depth == 1 and ch == _LBRACE:
+                    self.obj_start = i
+                depth += 1
+            elif ch == _RBRACE or ch == _RBRACKET:
+                depth -= 1
+                if depth == 0:
+                    if self.objs or self._is_json_list(self.buf[self.arr_start:i + 1]):
+                        self.done = True
+                        self.arr_end = i
+                    else:
+                        # Leading bracketed text that is not a JSON array (e.g. `[i]`)
+                        self.rejected = True
+                    break
+                if depth == 1 and ch == _RBRACE and self.obj_start != -1:
+                    self._emit(self.buf[self.obj_start:i + 1])
+                    self.obj_start = -1
+        self.depth = depth
+        self.in_str = in_str
+        self.skip_at = skip_at
+        return self.done
+
+    @staticmethod
+    def _is_json_list(raw: bytearray) -> bool:
+        try:
+            return isinstance(orjson.loads(raw), list)
+        except Exception:
+            return False
+
+    def _emit(self, raw: bytearray) -> None:
+        """Decode one completed top-level object; malformed objects are skipped."""
+        try:
+            obj = orjson.loads(raw)
+        except Exception as e:
+            logger.debug("LLM stream: skipping undecodable object (%s)", e)
+            return
+        if isinstance(obj, dict):
+            self.objs.append(obj)
+
+    def text(self) -> str:
+        """Return everything received so far as text (for fallback extraction)."""
+        return self.buf.decode("utf-8", "replace")
 
 
 def sanitize_llm_output(raw: str) -> str:
@@ -133,24 +241,23 @@ def sanitize_llm_output(raw: str) -> str:
     s = raw or ""
 
     # 1) Code fence first
-    m = re.findall(r"```json\s*([\s\S]*?)\s*```", s, flags=re.IGNORECASE)
-    for block in m:
-        cand = block.strip()
+    for m in FENCED_JSON_RE.finditer(s):
+        cand = m.group(1).strip()
         try:
-            obj = json.loads(cand)
+            obj = orjson.loads(cand)
             if isinstance(obj, list):
-                logger.debug(f"LLM fenced JSON extracted (len={len(cand)})")
+                logger.debug("LLM fenced JSON extracted (len=%d)", len(cand))
                 return cand
         except Exception:
             pass
 
     # 2) If no fence, scan inline candidates and return the first valid JSON array
-    candidates = JSON_ARRAY_RE.findall(s)
-    for cand in candidates:
+    for m in JSON_ARRAY_RE.finditer(s):
+        cand = m.group(0)
         try:
-            obj = json.loads(cand)
+            obj = orjson.loads(cand)
             if isinstance(obj, list):
-                logger.debug(f"LLM inline JSON array extracted (len={len(cand)})")
+                logger.debug("LLM inline JSON array extracted (len=%d)", len(cand))
                 return cand
         except Exception:
             continue
@@ -164,12 +271,15 @@ def _do_chat_stream(
     use_keep_alive: str,
     system_prompt: str,
     user_prompt: str,
+    deadline: float,
 ) -> List[Dict[str, Any]]:
     """Performs the actual Ollama stream call and JSON parsing (timeout logic is separated).
 
     This is called in a separate thread by chat_and_parse, a thread-safe timeout wrapper.
+    `deadline` is a `time.monotonic()` value checked per chunk so that a timed-out
+    worker stops consuming the stream instead of running on in the background.
     """
-    stream = ollama.chat(
+    stream = _ollama_client.chat(
         model=use_model,
         messages=[
             {"role": "system", "content": system_prompt},
@@ -185,56 +295,53 @@ def _do_chat_stream(
         stream=True,
     )
 
-    buf_parts: List[str] = []
-    parsed: Optional[List[Dict[str, Any]]] = None
-    for chunk in stream:
-        # Normalize chunk content across possible dict/object shapes
-        content = getattr(getattr(chunk, "message", None), "content", None)
-        if content is None and isinstance(chunk, dict):
-            msg = chunk.get("message")
-            if isinstance(msg, dict):
-                content = msg.get("content")
-        if not isinstance(content, str) or not content:
-            continue
-        # Accumulate partial content and check for a complete JSON array
-        buf_parts.append(content)
-        text = "".join(buf_parts)
-        span = _find_complete_json_array_span(text)
-        if span is not None:
-            start, end = span
-            array_text = text[start:end + 1]
-            try:
-                raw_comments = json.loads(array_text)
-                if isinstance(raw_comments, list):
-                    parsed = [c for c in raw_comments if isinstance(c, dict)]
-                    if parsed and len(parsed) > 0:
-                        logger.debug("LLM stream-early-stop: json array complete")
-                        logger.debug(f"LLM items={len(parsed)}")
-                    else:
-                        logger.debug("LLM stream-early-stop: empty JSON array []")
-                    break
-            except Exception:
-                pass
-
-    if parsed is None:
-        if not buf_parts:
-            logger.debug("LLM empty response (no content chunks)")
-            return []
-        # Fallback: sanitize accumulated text to extract a valid array
-        text = "".join(buf_parts)
-        cleaned = sanitize_llm_output(text)
-        if not cleaned:
-            logger.debug("LLM sanitize produced empty string; returning []")
-            return []
-        raw_comments = json.loads(cleaned)
-        if not isinstance(raw_comments, list):
-            logger.debug(f"LLM parsed non-list JSON: type={type(raw_comments)}")
-            return []
-        parsed = [c for c in raw_comments if isinstance(c, dict)]
-        if not parsed:
-            logger.debug("LLM parsed JSON array but contained 0 objects ([])")
-
-    return parsed or []
+    parser = ArrayStreamParser()
+    # Closing the generator ends the HTTP response so Ollama stops generating
+    with contextlib.closing(stream):
+        for chunk in stream:
+            if time.monotonic() > deadline:
+                raise OllamaTimeoutError(
+                    f"Ollama stream exceeded {OLLAMA_TIMEOUT_SECONDS}s (model={use_model})"
+                )
+            # Normalize chunk content across possible dict/object shapes
+            content = getattr(getattr(chunk, "message", None), "content", None)
+            if content is None and isinstance(chunk, dict):
+                msg = chunk.get("message")
+                if isinstance(msg, dict):
+                    content = msg.get("content")
+            if not isinstance(content, str) or not content:
+                continue
+            # Only the new chunk is scanned; completed objects are decoded as they close
+            if parser.feed(content):
+                if parser.objs:
+                    logger.debug("LLM stream-early-stop: json array complete")
+                    logger.debug("LLM items=%d", len(parser.objs))
+                else:
+                    logger.debug("LLM stream-early-stop: empty JSON array []")
+                return parser.objs
+            if len(parser.buf) > _MAX_STREAM_BYTES:
+                logger.warning(
+                    "LLM stream exceeded %d bytes without closing the JSON array; stopping",
+                    _MAX_STREAM_BYTES,
+                )
+                break
+
+    if not parser.buf:
+        logger.debug("LLM empty response (no content chunks)")
+        return []
+    # Fallback: the outer array never closed; sanitize accumulated text instead
+    cleaned = sanitize_llm_output(parser.text())
+    if not cleaned:
+        logger.debug("LLM sanitize produced empty string; returning []")
+        return []
+    raw_comments = orjson.loads(cleaned)
+    if not isinstance(raw_comments, list):
+        logger.debug("LLM parsed non-list JSON: type=%s", type(raw_comments))
+        return []
+    parsed = [c for c in raw_comments if isinstance(c, dict)]
+    if not parsed:
+        logger.debug("LLM parsed JSON array but contained 0 objects ([])")
+    return parsed
 
 
 def chat_and_parse(
@@ -242,15 +349,16 @@ def chat_and_parse(
     user_prompt: str,
     model: Optional[str] = None,
     keep_alive: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    """Stream a chat completion and parse a JSON array from the output.
+) -> List[LLMReviewComment]:
+    """Stream a chat completion and parse a JSON array of review comments.
 
     model: Ollama model name. If None, uses config MODEL_NAME.
     keep_alive: e.g. "0" (unload after request), "60m". If None, uses OLLAMA_KEEP_ALIVE.
 
-    Thread-safe timeout: uses threading.Timer instead of signal.SIGALRM so that
-    multiple passes can run concurrently in a ThreadPoolExecutor without stomping
-    on each other's alarm signal.
+    Thread-safe timeout: the caller waits on a threading.Event (no signal.SIGALRM),
+    so multiple passes can run concurrently in a ThreadPoolExecutor or under
+    uvicorn worker threads. The worker also checks a monotonic deadline per
+    streamed chunk and aborts itself once the timeout has passed.
     """
     use_model = model if model is not None else MODEL_NAME
     use_keep_alive = keep_alive if keep_alive is not None else OLLAMA_KEEP_ALIVE
@@ -258,11 +366,12 @@ def chat_and_parse(
     for attempt in range(OLLAMA_MAX_RETRIES):
         result_holder: List[Any] = [None]   # [0] = parsed list or exception
         done_event = threading.Event()
+        deadline = time.monotonic() + OLLAMA_TIMEOUT_SECONDS
 
         def _worker():
             try:
                 result_holder[0] = _do_chat_stream(
-                    use_model, use_keep_alive, system_prompt, user_prompt
+                    use_model, use_keep_alive, system_prompt, user_prompt, deadline
                 )
             except Exception as exc:
                 result_holder[0] = exc
@@ -272,8 +381,8 @@ def chat_and_parse(
         try:
             logger.info(f"LLM request start model={use_model} keep_alive={use_keep_alive}")
             logger.debug(
-                f"LLM attempt {attempt + 1}/{OLLAMA_MAX_RETRIES} "
-                f"timeout={OLLAMA_TIMEOUT_SECONDS}s"
+                "LLM attempt %d/%d timeout=%ss",
+                attempt + 1, OLLAMA_MAX_RETRIES, OLLAMA_TIMEOUT_SECONDS,
             )
 
             worker_thread = threading.Thread(target=_worker, daemon=True)
@@ -293,18 +402,23 @@ def chat_and_parse(
             if isinstance(outcome, Exception):
                 raise outcome
 
-            parsed = outcome or []
+            from escargot_review_bot.adapters.parsers import validate_comment_list
+
+            parsed = validate_comment_list(
+                LLMReviewCommentListAdapter, LLMReviewComment, outcome or []
+            )
             logger.info(f"LLM parsed comments: count={len(parsed)}")
-            try:
-                logger.debug(f"LLM sample parsed: {parsed[:2]}")
-            except Exception:
-                pass
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("LLM sample parsed: %r", [c.model_dump() for c in parsed[:2]])
 
             return parsed
 
         except OllamaTimeoutError as e:
             logger.warning(f"LLM timeout: {e}")
             if attempt + 1 < OLLAMA_MAX_RETRIES:
+                # Back off only between attempts, never after success or the final failure
+                if INTER_REQUEST_DELAY_SECONDS > 0:
+                    time.sleep(INTER_REQUEST_DELAY_SECONDS)
                 logger.info("LLM retrying...")
             else:
                 logger.error("LLM max retries reached. Aborting.")
@@ -312,12 +426,6 @@ def chat_and_parse(
         except Exception as e:
             logger.error(f"LLM unexpected error: {e}")
             return []
-        finally:
-            if INTER_REQUEST_DELAY_SECONDS > 0:
-                try:
-                    time.sleep(INTER_REQUEST_DELAY_SECONDS)
-                except Exception:
-                    pass
 
     return []
 
@@ -341,14 +449,96 @@ def build_review_chain(
     from escargot_review_bot.prompts import get_prompt
     from escargot_review_bot.adapters.parsers import review_comment_list_parser
     
-    prompt = get_prompt(pass_type)
+    prompt = get_prompt(pass_type, model or MODEL_NAME)
     llm = get_cached_llm(model or MODEL_NAME)
     
     chain = prompt | llm | review_comment_list_parser
-    logger.debug(f"Built review chain for pass_type={pass_type}, model={model or MODEL_NAME}")
+    logger.debug("Built review chain for pass_type=%s, model=%s", pass_type, model or MODEL_NAME)
     return chain
 
 
+def stream_review_comments(
+    pass_type: str,
+    chain_input: Dict[str, str],
+    model: Optional[str] = None,
+) -> Tuple[List[LLMReviewComment], bool]:
+    """Run a review pass with a streamed response, parsing the array as it streams.
+
+    Streams `prompt | llm` and feeds each chunk to `ArrayStreamParser`, so
+    comment objects are decoded as they complete. Once the outer JSON array
+    ends (e.g. right after an early `[]`), the rest of the stream is drained
+    unparsed so the traced LLM run completes normally; the stream is only
+    closed (Ollama stops generating) if more than `_MAX_DRAIN_CHARS` follow.
+    Early stop only applies when the array opens the response (leading
+    whitespace or a ```` ```json ```` fence at most); after any prose preamble,
+    even one with bracketed code like `buf[0]`, the whole response is read and
+    goes through the regular review parser instead, which prefers fenced blocks.
+
+    Args:
+        pass_type: One of "defect", "refactor", "compiler", "style"
+        chain_input: {"file_path", "hunk_text", "commentable_catalog"}
+        model: Ollama model name. Defaults to MODEL_NAME.
+
+    Returns:
+        (comments, complete): validated List[LLMReviewComment] (same result as
+        build_review_chain().invoke()), and whether the closed JSON array was the
+        whole response (only whitespace or a code fence around it). `complete` is
+        False for fallback parses, trailing text after the array, and output cut
+        off at the stream size or drain cap.
+    """
+    from escargot_review_bot.prompts import get_prompt
+    from escargot_review_bot.adapters.parsers import review_comment_list_parser, validate_comment_list
+
+    use_model = model or MODEL_NAME
+    chain = get_prompt(pass_type, use_model) | get_cached_llm(use_model)
+
+    parser = ArrayStreamParser()
+    drained: List[str] = []
+    drained_len = 0
+    stream = chain.stream(chain_input)
+    # Closing the generator ends the HTTP response so Ollama stops generating
+    with contextlib.closing(stream):
+        for chunk in stream:
+            content = chunk.content
+            if not isinstance(content, str) or not content:
+                continue
+            if parser.done:
+                # Drain the tail (closing fence, Ollama's final message) so the LLM run
+                # finishes normally; closing mid-stream marks the traced run as errored
+                drained.append(content)
+                drained_len += len(content)
+                if drained_len > _MAX_DRAIN_CHARS:
+                    logger.debug("LLM still generating after the JSON array; closing stream")
+                    break
+                continue
+            if parser.feed(content):
+                logger.debug("LLM stream-early-stop: %s items=%d", pass_type, len(parser.objs))
+                continue
+            if len(parser.buf) > _MAX_STREAM_BYTES:
+                logger.warning(
+                    "LLM stream exceeded %d bytes without closing the JSON array; stopping",
+                    _MAX_STREAM_BYTES,
+                )
+                break
+
+    if parser.done:
+        # Complete only if the array was the whole response: nothing but whitespace
+        # or the closing fence after `]` (a truncated drain never qualifies)
+        tail = bytes(parser.buf[parser.arr_end + 1:]) + "".join(drained).encode("utf-8")
+        complete = drained_len <= _MAX_DRAIN_CHARS and tail.strip() in (b"", b"```")
+        return validate_comment_list(
+            LLMReviewCommentListAdapter, LLMReviewComment, parser.objs
+        ), complete
+
+    # No leading array closed in the stream (preamble or truncation); fall back to
+    # fenced/inline extraction over the full text
+    logger.debug(
+        "LLM stream ended without a leading JSON array: %s rejected=%s (fallback parse)",
+        pass_type, parser.rejected,
+    )
+    return review_comment_list_parser.parse(parser.text()), False
+
+
 def build_judge_chain(
     model: Optional[str] = None,
 ) -> RunnableSerializable:
@@ -370,5 +560,5 @@ def build_judge_chain(
     llm = get_cached_llm(model or MODEL_NAME)
     
     chain = prompt | llm | judge_comment_list_parser
-    logger.debug(f"Built judge chain with model={model or MODEL_NAME}")
+    logger.debug("Built judge chain with model=%s", model or MODEL_NAME)
     return chain
\ No newline at end of file
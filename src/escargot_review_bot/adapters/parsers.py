@@ -10,9 +10,14 @@ from typing import Any, Dict, List, Optional, Type, TypeVar
 
 from langchain_core.output_parsers import BaseOutputParser
 from langchain_core.exceptions import OutputParserException
-from pydantic import BaseModel, ValidationError
-
-from escargot_review_bot.domain.schemas import LLMReviewComment, JudgeComment
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from escargot_review_bot.domain.schemas import (
+    JudgeComment,
+    JudgeCommentListAdapter,
+    LLMReviewComment,
+    LLMReviewCommentListAdapter,
+)
 from escargot_review_bot.config.logging import get_logger
 
 
@@ -21,6 +26,7 @@ logger = get_logger("review-bot.parsers")
 T = TypeVar("T", bound=BaseModel)
 
 JSON_ARRAY_RE = re.compile(r"\[[\s\S]*?\]")
+FENCED_JSON_RE = re.compile(r"```json\s*([\s\S]*?)\s*```", re.IGNORECASE)
 
 
 def _find_complete_json_array_span(s: str) -> Optional[tuple]:
@@ -66,9 +72,8 @@ def sanitize_llm_output(raw: str) -> str:
     """
     s = raw or ""
 
-    m = re.findall(r"```json\s*([\s\S]*?)\s*```", s, flags=re.IGNORECASE)
-    for block in m:
-        cand = block.strip()
+    for m in FENCED_JSON_RE.finditer(s):
+        cand = m.group(1).strip()
         try:
             obj = json.loads(cand)
             if isinstance(obj, list):
@@ -77,8 +82,8 @@ def sanitize_llm_output(raw: str) -> str:
         except Exception:
             pass
 
-    candidates = JSON_ARRAY_RE.findall(s)
-    for cand in candidates:
+    for m in JSON_ARRAY_RE.finditer(s):
+        cand = m.group(0)
         try:
             obj = json.loads(cand)
             if isinstance(obj, list):
@@ -91,6 +96,38 @@ def sanitize_llm_output(raw: str) -> str:
     return ""
 
 
+def validate_comment_list(
+    adapter: TypeAdapter,
+    model: Type[T],
+    raw_list: List[Any],
+) -> List[T]:
+    """Validate parsed JSON items into `model` instances.
+
+    Non-dict items are dropped, then the remaining dicts are validated in one
+    call through the precompiled list `adapter`. If that fails, fall back to
+    per-item validation so a single bad item does not discard the rest.
+    """
+    items: List[Dict[str, Any]] = []
+    for item in raw_list:
+        if not isinstance(item, dict):
+            logger.debug(f"Skipping non-dict item: {type(item)}")
+            continue
+        items.append(item)
+
+    try:
+        return adapter.validate_python(items)
+    except ValidationError:
+        pass
+
+    validated: List[T] = []
+    for item in items:
+        try:
+            validated.append(model.model_validate(item))
+        except ValidationError as e:
+            logger.debug(f"Validation failed for item {item}: {e}")
+    return validated
+
+
 class ReviewCommentListParser(BaseOutputParser[List[LLMReviewComment]]):
     """Parser for extracting a list of LLMReviewComment from LLM output.
     
@@ -128,19 +165,7 @@ class ReviewCommentListParser(BaseOutputParser[List[LLMReviewComment]]):
             logger.warning(f"Expected list, got {type(raw_list)}")
             return []
         
-        comments: List[LLMReviewComment] = []
-        for item in raw_list:
-            if not isinstance(item, dict):
-                logger.debug(f"Skipping non-dict item: {type(item)}")
-                continue
-            try:
-                comment = LLMReviewComment(**item)
-                comments.append(comment)
-            except ValidationError as e:
-                logger.debug(f"Validation failed for item {item}: {e}")
-                continue
-        
-        return comments
+        return validate_comment_list(LLMReviewCommentListAdapter, LLMReviewComment, raw_list)
     
     def get_format_instructions(self) -> str:
         return (
@@ -187,19 +212,7 @@ class JudgeCommentListParser(BaseOutputParser[List[JudgeComment]]):
             logger.warning(f"Expected list, got {type(raw_list)}")
             return []
         
-        comments: List[JudgeComment] = []
-        for item in raw_list:
-            if not isinstance(item, dict):
-                logger.debug(f"Skipping non-dict item: {type(item)}")
-                continue
-            try:
-                comment = JudgeComment(**item)
-                comments.append(comment)
-            except ValidationError as e:
-                logger.debug(f"Validation failed for item {item}: {e}")
-                continue
-        
-        return comments
+        return validate_comment_list(JudgeCommentListAdapter, JudgeComment, raw_list)
     
     def get_format_instructions(self) -> str:
         return (
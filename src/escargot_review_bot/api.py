@@ -1,6 +1,7 @@
 import asyncio
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 
 from escargot_review_bot.config.config import REVIEW_MAX_CONCURRENCY
 from escargot_review_bot.config.logging import get_logger
@@ -8,7 +9,11 @@ from escargot_review_bot.domain.schemas import ReviewRequest
 from escargot_review_bot.service import generate_review_comments
 
 
-app = FastAPI(title="Escargot Review Bot API", version="1.0")
+app = FastAPI(
+    title="Escargot Review Bot API",
+    version="1.0",
+    default_response_class=ORJSONResponse,
+)
 logger = get_logger("review-bot.app")
 
 _review_semaphore = asyncio.Semaphore(REVIEW_MAX_CONCURRENCY)
@@ -30,7 +35,13 @@ async def _queue_review_requests(request, call_next):
 
 
 @app.post("/review")
-async def handle_review_request(request: ReviewRequest) -> JSONResponse:
-    """Handle a code review request and return generated comments as JSON."""
-    comments = generate_review_comments(request)
-    return JSONResponse(content={"comments": comments})
\ No newline at end of file
+async def handle_review_request(request: ReviewRequest) -> ORJSONResponse:
+    """Handle a code review request and return generated comments as JSON.
+
+    The blocking review pipeline runs in Starlette's threadpool so the event loop
+    stays free for queued requests; `_queue_review_requests` still bounds how many
+    reviews run at once. Serialized with orjson, which encodes large comment
+    arrays straight to bytes.
+    """
+    comments = await run_in_threadpool(generate_review_comments, request)
+    return ORJSONResponse(content={"comments": comments})
\ No newline at end of file
@@ -32,20 +32,37 @@ REVIEW_INCLUDE_PATHS: List[str] = [
 
 
 # Ollama / LLM configuration
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
 MODEL_NAME = os.getenv("OLLAMA_MODEL", "qwen3-coder:30b")
 OLLAMA_MODEL_DEFECT = os.getenv("OLLAMA_MODEL_DEFECT", "qwen3-coder:30b")
 OLLAMA_MODEL_REFACTOR = os.getenv("OLLAMA_MODEL_REFACTOR", "qwen3-coder:30b")
 OLLAMA_MODEL_COMPILER = os.getenv("OLLAMA_MODEL_COMPILER", "qwen3-coder:30b")
 OLLAMA_MODEL_STYLE = os.getenv("OLLAMA_MODEL_STYLE", "qwen3-coder:30b")
 OLLAMA_MODEL_JUDGE = os.getenv("OLLAMA_MODEL_JUDGE", "gpt-oss:20b")
-OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "0")
+# Keep models resident so Ollama reuses the KV cache of the static system prompt prefix
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
 OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.1"))
 OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
 OLLAMA_NUM_BATCH = int(os.getenv("OLLAMA_NUM_BATCH", "256"))
 OLLAMA_REPEAT_PENALTY = float(os.getenv("OLLAMA_REPEAT_PENALTY", "1.1"))
+# Few-shot examples appended to the defect prompt (0 strips the EXAMPLES section)
+DEFECT_PROMPT_EXAMPLES = int(os.getenv("DEFECT_PROMPT_EXAMPLES", "5"))
+# Use the compact (V2) decision tree / confidence rubric in the defect prompt
+DEFECT_PROMPT_V2 = os.getenv("DEFECT_PROMPT_V2", "false").lower() in ("1", "true", "yes")
+# Models that receive the minified defect prompt (compact rubric, no examples)
+DEFECT_PROMPT_MINIFIED_MODELS: List[str] = [
+    m.strip() for m in os.getenv("DEFECT_PROMPT_MINIFIED_MODELS", "").split(",") if m.strip()
+]
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.8"))
 ALIGN_SEARCH_WINDOW = int(os.getenv("ALIGN_SEARCH_WINDOW", "25"))
 OLLAMA_TIMEOUT_SECONDS = int(os.getenv("OLLAMA_TIMEOUT_SECONDS", "10800"))  # 3-hour window: 10800s per request
 OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "2"))
-INTER_REQUEST_DELAY_SECONDS = float(os.getenv("INTER_REQUEST_DELAY_SECONDS", "5"))
+INTER_REQUEST_DELAY_SECONDS = float(os.getenv("INTER_REQUEST_DELAY_SECONDS", "0"))
+
+
+# In-process cache of review pass results keyed by (pass, model, prompt version, hunk hash); 0 disables
+REVIEW_CACHE_TTL_SECONDS = float(os.getenv("REVIEW_CACHE_TTL_SECONDS", "86400"))
+REVIEW_CACHE_MAX_ENTRIES = int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", "4096"))
+# Normalized HEAD blobs kept across requests (LRU, keyed by "<sha>:<path>"); 0 disables
+HEAD_BLOB_CACHE_MAX_ENTRIES = int(os.getenv("HEAD_BLOB_CACHE_MAX_ENTRIES", "1024"))
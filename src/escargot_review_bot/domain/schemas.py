@@ -1,5 +1,5 @@
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from langchain_core.output_parsers import JsonOutputParser
 
 
@@ -38,5 +38,10 @@ class GitHubComment(BaseModel):
     side: Literal["LEFT", "RIGHT"]
 
 
+# Compiled once; validates a whole parsed array in a single core-schema call
+LLMReviewCommentListAdapter = TypeAdapter(List[LLMReviewComment])
+JudgeCommentListAdapter = TypeAdapter(List[JudgeComment])
+
+
 review_comment_parser = JsonOutputParser(pydantic_object=LLMReviewComment)
 judge_comment_parser = JsonOutputParser(pydantic_object=JudgeComment)
\ No newline at end of file
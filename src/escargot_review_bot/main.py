@@ -1,12 +1,17 @@
-import os
 import sys
 
 from escargot_review_bot.api import app
 
-if __name__ == "__main__":
+
+def main() -> None:
+    """Run the review API server with uvicorn."""
     try:
         import uvicorn
     except Exception:
         print("uvicorn is required to run the server. Install dependencies first.")
         sys.exit(1)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 """Prompt definitions and templates for review passes."""
 
-from escargot_review_bot.prompts.defect import SYSTEM_PROMPT_DEFECT
+from escargot_review_bot.prompts.defect import (
+    SYSTEM_PROMPT_DEFECT,
+    SYSTEM_PROMPT_DEFECT_V2,
+    SYSTEM_PROMPT_DEFECT_VERSION,
+    build_defect_prompt,
+)
 from escargot_review_bot.prompts.refactor import SYSTEM_PROMPT_REFACTOR
 from escargot_review_bot.prompts.compiler import SYSTEM_PROMPT_COMPILER
 from escargot_review_bot.prompts.style import SYSTEM_PROMPT_STYLE
 from escargot_review_bot.prompts.judge import SYSTEM_PROMPT_JUDGE
 from escargot_review_bot.prompts.templates import (
     get_prompt,
+    get_prompt_version,
+    get_defect_prompt,
     defect_prompt,
     refactor_prompt,
     compiler_prompt,
@@ -17,11 +24,16 @@ from escargot_review_bot.prompts.templates import (
 
 __all__ = [
     "SYSTEM_PROMPT_DEFECT",
+    "SYSTEM_PROMPT_DEFECT_V2",
+    "SYSTEM_PROMPT_DEFECT_VERSION",
     "SYSTEM_PROMPT_REFACTOR",
     "SYSTEM_PROMPT_COMPILER",
     "SYSTEM_PROMPT_STYLE",
     "SYSTEM_PROMPT_JUDGE",
+    "build_defect_prompt",
     "get_prompt",
+    "get_prompt_version",
+    "get_defect_prompt",
     "defect_prompt",
     "refactor_prompt",
     "compiler_prompt",
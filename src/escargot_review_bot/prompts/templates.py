@@ -4,10 +4,19 @@ This module provides ChatPromptTemplate wrappers around the existing system prom
 enabling structured prompt management and variable interpolation.
 """
 
+import hashlib
+from functools import lru_cache
+from typing import Dict, Optional
+
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
 from langchain_core.messages import SystemMessage
 
-from escargot_review_bot.prompts.defect import SYSTEM_PROMPT_DEFECT
+from escargot_review_bot.config.config import (
+    DEFECT_PROMPT_EXAMPLES,
+    DEFECT_PROMPT_MINIFIED_MODELS,
+    DEFECT_PROMPT_V2,
+)
+from escargot_review_bot.prompts.defect import SYSTEM_PROMPT_DEFECT_MINIFIED, build_defect_prompt
 from escargot_review_bot.prompts.refactor import SYSTEM_PROMPT_REFACTOR
 from escargot_review_bot.prompts.compiler import SYSTEM_PROMPT_COMPILER
 from escargot_review_bot.prompts.style import SYSTEM_PROMPT_STYLE
@@ -50,8 +59,25 @@ JUDGE_USER_TEMPLATE = """\
 {proposals_text}"""
 
 
+DEFECT_SYSTEM_PROMPT = build_defect_prompt(DEFECT_PROMPT_EXAMPLES, compact=DEFECT_PROMPT_V2)
+
+SYSTEM_PROMPT_DEFECT_BY_MODEL: Dict[str, str] = {
+    m: SYSTEM_PROMPT_DEFECT_MINIFIED for m in DEFECT_PROMPT_MINIFIED_MODELS
+}
+
+
+def get_defect_prompt(model: Optional[str]) -> str:
+    """Return the defect system prompt text selected for `model`."""
+    return SYSTEM_PROMPT_DEFECT_BY_MODEL.get(model or "", DEFECT_SYSTEM_PROMPT)
+
+
 defect_prompt = ChatPromptTemplate.from_messages([
-    SystemMessage(content=SYSTEM_PROMPT_DEFECT),
+    SystemMessage(content=DEFECT_SYSTEM_PROMPT),
+    HumanMessagePromptTemplate.from_template(REVIEW_USER_TEMPLATE),
+])
+
+defect_prompt_minified = ChatPromptTemplate.from_messages([
+    SystemMessage(content=SYSTEM_PROMPT_DEFECT_MINIFIED),
     HumanMessagePromptTemplate.from_template(REVIEW_USER_TEMPLATE),
 ])
 
@@ -85,11 +111,13 @@ PROMPT_REGISTRY = {
 }
 
 
-def get_prompt(pass_type: str) -> ChatPromptTemplate:
+def get_prompt(pass_type: str, model: Optional[str] = None) -> ChatPromptTemplate:
     """Get the ChatPromptTemplate for the specified pass type.
     
     Args:
         pass_type: One of "defect", "refactor", "compiler", "style", "judge"
+        model: Target model name. Models listed in DEFECT_PROMPT_MINIFIED_MODELS
+            get the minified defect prompt.
         
     Returns:
         ChatPromptTemplate configured for the specified pass
@@ -99,4 +127,21 @@ def get_prompt(pass_type: str) -> ChatPromptTemplate:
     """
     if pass_type not in PROMPT_REGISTRY:
         raise KeyError(f"Unknown pass type: {pass_type}. Available: {list(PROMPT_REGISTRY.keys())}")
+    if pass_type == "defect" and model in SYSTEM_PROMPT_DEFECT_BY_MODEL:
+        return defect_prompt_minified
     return PROMPT_REGISTRY[pass_type]
+
+
+@lru_cache(maxsize=None)
+def get_prompt_version(pass_type: str, model: Optional[str] = None) -> str:
+    """Return a short content hash of the prompt used for `pass_type`/`model`.
+
+    Covers both the system prompt and the user template, so any prompt edit
+    yields a new version (used to key cached review results).
+    """
+    digest = hashlib.sha256()
+    for message in get_prompt(pass_type, model).messages:
+        text = message.content if isinstance(message, SystemMessage) else message.prompt.template
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
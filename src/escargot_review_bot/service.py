@@ -1,3 +1,7 @@
+import bisect
+import contextvars
+import itertools
+import re
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -5,18 +9,22 @@ import langsmith as ls
 from fastapi import HTTPException
 from unidiff import PatchSet, Hunk
 
-from escargot_review_bot.adapters.git import run_git_command
-from escargot_review_bot.adapters.llm import build_review_chain, build_judge_chain
+from escargot_review_bot.adapters.cache import LRUCache, make_review_cache_key
+from escargot_review_bot.adapters.git import find_missing_objects, read_blobs, run_git_command
+from escargot_review_bot.adapters.llm import build_judge_chain, stream_review_comments
 from escargot_review_bot.config.config import (
     ALIGN_SEARCH_WINDOW,
     CONFIDENCE_THRESHOLD,
     DIFF_CONTEXT,
+    HEAD_BLOB_CACHE_MAX_ENTRIES,
     OLLAMA_KEEP_ALIVE,
     OLLAMA_MODEL_COMPILER,
     OLLAMA_MODEL_DEFECT,
     OLLAMA_MODEL_JUDGE,
     OLLAMA_MODEL_REFACTOR,
     OLLAMA_MODEL_STYLE,
+    REVIEW_CACHE_MAX_ENTRIES,
+    REVIEW_CACHE_TTL_SECONDS,
     REVIEW_INCLUDE_PATHS,
     REVIEW_PARALLEL_PASSES,
     REVIEW_PARALLEL_WORKERS,
@@ -27,6 +35,7 @@ from escargot_review_bot.domain.schemas import (
     LLMReviewComment,
     ReviewRequest,
 )
+from escargot_review_bot.prompts.templates import get_prompt_version
 
 
 logger = get_logger("review-bot.service")
@@ -34,9 +43,28 @@ logger = get_logger("review-bot.service")
 # Pass-type → comment tag mapping
 PASS_TAG: dict = {"defect": "[D]", "refactor": "[R]", "compiler": "[C]", "style": "[S]"}
 
+# str.startswith accepts a tuple, so the include filter is a single C-level call
+_INCLUDE_PREFIXES = tuple(REVIEW_INCLUDE_PATHS)
+
+# Raw LLM comments per (pass, model, prompt version, hunk) so unchanged hunks skip the LLM on re-runs
+_review_cache: LRUCache[List[LLMReviewComment]] = LRUCache(
+    REVIEW_CACHE_MAX_ENTRIES, REVIEW_CACHE_TTL_SECONDS
+)
+
+# Normalized HEAD lines and their line index per "<sha>:<path>", shared across requests.
+# Blob content is immutable for a given SHA, so entries never expire (LRU eviction only).
+# Only full object ids are cached: a branch name or abbreviated SHA can move.
+_FULL_OID_RE = re.compile(r"[0-9a-fA-F]{40}|[0-9a-fA-F]{64}")
+_head_lines_cache: LRUCache[Tuple[List[str], Dict[str, List[int]]]] = LRUCache(
+    HEAD_BLOB_CACHE_MAX_ENTRIES, float("inf")
+)
+
 
 class LineMappingLite:
     """Unified diff line mapping with stable `target_id` and side line numbers."""
+    # One instance per diff line; slots drop the per-instance __dict__
+    __slots__ = ("target_id", "line_type", "content", "source_line_no", "target_line_no", "normalized")
+
     def __init__(self, target_id: int, line_type: str, content: str,
                  source_line_no: Optional[int], target_line_no: Optional[int]) -> None:
         self.target_id = target_id
@@ -44,6 +72,8 @@ class LineMappingLite:
         self.content = content
         self.source_line_no = source_line_no
         self.target_line_no = target_line_no
+        # Prefix-stripped, normalized content for HEAD alignment comparisons
+        self.normalized = normalize_for_compare(line_without_prefix(content))
 
 
 def create_line_mappings_for_hunk(hunk: Hunk) -> List[LineMappingLite]:
@@ -97,7 +127,12 @@ def create_line_mappings_for_hunk(hunk: Hunk) -> List[LineMappingLite]:
 
 def normalize_for_compare(s: str) -> str:
     """Expand tabs(4) and strip to normalize for alignment comparison."""
-    return (s or "").expandtabs(4).strip()
+    s = s or ""
+    # Fast path: most lines have no tabs, so skip the expandtabs copy. Tabs must be
+    # expanded before stripping since tab stops depend on the leading indentation.
+    if "\t" not in s:
+        return s.strip()
+    return s.expandtabs(4).strip()
 
 
 def line_without_prefix(raw: str) -> str:
@@ -126,9 +161,8 @@ def _collect_target_side_context(
 ) -> Tuple[List[str], List[str]]:
     """Collect up to `max_depth` normalized target-side neighbor lines.
 
-    Returns (prev_list, next_list), where each element is normalized with
-    `line_without_prefix` and `normalize_for_compare`. Only mappings with a
-    valid `target_line_no` are considered.
+    Returns (prev_list, next_list) of the mappings' precomputed `normalized`
+    content. Only mappings with a valid `target_line_no` are considered.
     """
     prev_ctx: List[str] = []
     next_ctx: List[str] = []
@@ -138,7 +172,7 @@ def _collect_target_side_context(
     while i >= 0 and len(prev_ctx) < max_depth:
         mi = mappings[i]
         if mi.target_line_no is not None:
-            prev_ctx.append(normalize_for_compare(line_without_prefix(mi.content)))
+            prev_ctx.append(mi.normalized)
         i -= 1
 
     # Walk right for next target-side lines
@@ -146,38 +180,41 @@ def _collect_target_side_context(
     while i < len(mappings) and len(next_ctx) < max_depth:
         mi = mappings[i]
         if mi.target_line_no is not None:
-            next_ctx.append(normalize_for_compare(line_without_prefix(mi.content)))
+            next_ctx.append(mi.normalized)
         i += 1
 
     return prev_ctx, next_ctx
 
 
+def build_line_index(norm_lines: List[str]) -> Dict[str, List[int]]:
+    """Map each normalized HEAD line to the sorted indices where it occurs."""
+    index: Dict[str, List[int]] = {}
+    for idx, line in enumerate(norm_lines):
+        index.setdefault(line, []).append(idx)
+    return index
+
+
 def assert_head_alignment(head_sha: str, path: str, mapping: LineMappingLite,
-                          head_cache: Dict[str, List[str]]) -> Optional[bool]:
+                          head_norm_cache: Dict[str, List[str]]) -> Optional[bool]:
     """Check exact alignment of an added line at `target_line_no` in HEAD.
 
-    Uses a cached `git show {head_sha}:{path}` blob. Returns True/False for
-    match/mismatch, or None if not applicable (non-added or missing position).
+    Reads normalized HEAD blob lines from `head_norm_cache`, which is prefilled
+    for every reviewed file before the passes run. Returns True/False for match/mismatch,
+    or None if not applicable (non-added or missing position).
     """
     if mapping.line_type != 'added' or mapping.target_line_no is None:
         return None
 
-    # Lazy-load and cache the HEAD blob lines for this file
-    key = f"{head_sha}:{path}"
-    if key not in head_cache:
-        blob_text = run_git_command(["show", f"{head_sha}:{path}"])
-        head_cache[key] = blob_text.splitlines()
-
-    lines = head_cache[key]
+    lines = head_norm_cache.get(f"{head_sha}:{path}", [])
     idx = mapping.target_line_no - 1
     # Treat out-of-range as invalid expected position against HEAD
     if not (0 <= idx < len(lines)):
         logger.debug(f"Align out-of-range: {path}:{mapping.target_line_no} (len={len(lines)})")
         return False
 
-    # Normalize both sides before equality check to avoid whitespace noise
-    expected = normalize_for_compare(line_without_prefix(mapping.content))
-    actual = normalize_for_compare(lines[idx])
+    # Both sides are pre-normalized to avoid whitespace noise
+    expected = mapping.normalized
+    actual = lines[idx]
 
     if expected == actual:
         return True
@@ -192,43 +229,33 @@ def try_nearby_align(
     head_sha: str,
     path: str,
     mapping: LineMappingLite,
-    head_cache: Dict[str, List[str]],
+    head_norm_cache: Dict[str, List[str]],
+    head_index_cache: Dict[str, Dict[str, List[int]]],
     prev_context: Optional[List[str]] = None,
     next_context: Optional[List[str]] = None,
 ) -> Optional[int]:
     """Search within +/-`ALIGN_SEARCH_WINDOW` for a nearby normalized match.
 
-    If multiple candidates are found, disambiguate using up to 1-2 lines of
+    Called after the exact position failed `assert_head_alignment` (see
+    `resolve_line_no`), so `target_line_no` itself is not rechecked. If
+    multiple candidates are found, disambiguate using up to 1-2 lines of
     previous/next target-side context. Only a unique highest-scoring candidate
     is accepted; otherwise return None.
     """
     if mapping.line_type != 'added' or mapping.target_line_no is None:
         return None
 
-    # Reuse cached HEAD blob if already loaded; otherwise load once
     key = f"{head_sha}:{path}"
-    if key not in head_cache:
-        blob_text = run_git_command(["show", f"{head_sha}:{path}"])
-        head_cache[key] = blob_text.splitlines()
-
-    lines = head_cache[key]
+    lines = head_norm_cache.get(key, [])
     total = len(lines)
     base_idx = mapping.target_line_no - 1
-    expected = normalize_for_compare(line_without_prefix(mapping.content))
-
-    # Quick path: current index already matches after normalization
-    if 0 <= base_idx < total and normalize_for_compare(lines[base_idx]) == expected:
-        return mapping.target_line_no
+    expected = mapping.normalized
 
-    # Collect all candidate positions within the search window
-    candidates: List[int] = []
-    for delta in range(1, ALIGN_SEARCH_WINDOW + 1):
-        up = base_idx - delta
-        if 0 <= up < total and normalize_for_compare(lines[up]) == expected:
-            candidates.append(up)
-        down = base_idx + delta
-        if 0 <= down < total and normalize_for_compare(lines[down]) == expected:
-            candidates.append(down)
+    # Slice candidate positions within the search window from the line index
+    positions = head_index_cache.get(key, {}).get(expected, [])
+    lo = bisect.bisect_left(positions, base_idx - ALIGN_SEARCH_WINDOW)
+    hi = bisect.bisect_right(positions, base_idx + ALIGN_SEARCH_WINDOW)
+    candidates = positions[lo:hi]
 
     if not candidates:
         return None
@@ -250,12 +277,12 @@ def try_nearby_align(
         # Match previous neighbors: prev_context[0] is nearest neighbor
         for offset, txt in enumerate(prev_context, start=1):
             nei = pos - offset
-            if 0 <= nei < total and normalize_for_compare(lines[nei]) == txt:
+            if 0 <= nei < total and lines[nei] == txt:
                 score += 1
         # Match next neighbors: next_context[0] is nearest neighbor
         for offset, txt in enumerate(next_context, start=1):
             nei = pos + offset
-            if 0 <= nei < total and normalize_for_compare(lines[nei]) == txt:
+            if 0 <= nei < total and lines[nei] == txt:
                 score += 1
 
         if score > best_score:
@@ -272,25 +299,54 @@ def try_nearby_align(
     return None
 
 
+def resolve_line_no(
+    head_sha: str,
+    path: str,
+    mapping: LineMappingLite,
+    mappings: List[LineMappingLite],
+    head_norm_cache: Dict[str, List[str]],
+    head_index_cache: Dict[str, Dict[str, List[int]]],
+) -> Optional[int]:
+    """Resolve the HEAD line number to comment on for an added-line mapping.
+
+    Returns `target_line_no` when it matches HEAD exactly; otherwise falls back
+    to `try_nearby_align` with target-side neighbor context. Returns None when
+    no unambiguous position is found.
+    """
+    head_ok = assert_head_alignment(head_sha, path, mapping, head_norm_cache)
+    if head_ok is None:
+        return None
+    if head_ok:
+        return mapping.target_line_no
+
+    logger.debug(f"Align mismatch at ~{mapping.target_line_no}, trying nearby align...")
+    # target_id is assigned 1..N in mapping order by create_line_mappings_for_hunk
+    prev_ctx, next_ctx = _collect_target_side_context(mappings, mapping.target_id - 1, max_depth=2)
+    return try_nearby_align(
+        head_sha,
+        path,
+        mapping,
+        head_norm_cache,
+        head_index_cache,
+        prev_context=prev_ctx,
+        next_context=next_ctx,
+    )
+
+
 def prepare_chain_input(path: str, hunk: Hunk, mappings: List[LineMappingLite]) -> Dict[str, str]:
     """Prepare input dictionary for LangChain review chains.
 
     Returns a dict with keys: file_path, hunk_text, commentable_catalog
-    that can be passed directly to build_review_chain().invoke()
+    that can be passed to stream_review_comments() or build_review_chain().invoke()
     """
     hunk_text = str(hunk)
-    commentable = [
-        m for m in mappings
-        if m.line_type == 'added' and is_meaningful_code(line_without_prefix(m.content))
-    ]
-    if commentable:
-        commentable_catalog = [
-            f"<ID {m.target_id} | {m.line_type.upper()}>: {line_without_prefix(m.content).strip()}"
-            for m in commentable
-        ]
-        commentable_str = "\n".join(commentable_catalog)
-    else:
-        commentable_str = "(no added lines)"
+    # Single pass over the mappings; the filter reuses the precomputed `normalized`
+    # text (stripping makes it equivalent for is_meaningful_code)
+    commentable_str = "\n".join(
+        f"<ID {m.target_id} | ADDED>: {line_without_prefix(m.content).strip()}"
+        for m in mappings
+        if m.line_type == 'added' and is_meaningful_code(m.normalized)
+    ) or "(no added lines)"
 
     return {
         "file_path": path,
@@ -319,52 +375,65 @@ def fetch_upstream_with_fallback(pull_request_number: int, base_sha: str, head_s
     except Exception as e:
         logger.warning(f"PR ref not found (continuing with SHAs): {e}")
 
-    # 3) ensure both base/head SHAs are present; try direct SHA fetch when absent
-    for sha in [base_sha, head_sha]:
-        try:
-            run_git_command(["cat-file", "-e", f"{sha}^{{commit}}"])
-            continue
-        except Exception:
-            pass
+    # 3) ensure both base/head SHAs are present (one batch check); fetch missing SHAs directly
+    commits = {f"{sha}^{{commit}}": sha for sha in (base_sha, head_sha)}
+    missing = [commits[name] for name in find_missing_objects(list(commits))]
+    if not missing:
+        return
+    for sha in missing:
         try:
             run_git_command(["fetch", "upstream", sha])
         except Exception as e:
             logger.warning(f"Direct SHA fetch failed (sha={sha}): {e}")
-        try:
-            run_git_command(["cat-file", "-e", f"{sha}^{{commit}}"])
-        except Exception:
-            logger.error(f"Missing commit after fetch attempts: {sha}")
-            raise HTTPException(status_code=400, detail=f"Missing commit in upstream: {sha}")
+    still_missing = [
+        commits[name]
+        for name in find_missing_objects([f"{sha}^{{commit}}" for sha in missing])
+    ]
+    if still_missing:
+        sha = still_missing[0]
+        logger.error(f"Missing commit after fetch attempts: {', '.join(still_missing)}")
+        raise HTTPException(status_code=400, detail=f"Missing commit in upstream: {sha}")
 
 
 def _run_review_pass(
     model_type: str,
     model_name: str,
     file_path: str,
-    hunk: Hunk,
+    chain_input: Dict[str, str],
     mappings: List[LineMappingLite],
     mapping_dict: Dict[int, Any],
     head_sha: str,
-    head_blob_cache: Dict[str, List[str]],
+    head_norm_cache: Dict[str, List[str]],
+    head_index_cache: Dict[str, Dict[str, List[int]]],
     skip_ids: Set[int] | None = None,
 ) -> Tuple[List[Dict[str, Any]], Set[int]]:
     """Run one pass (defect/refactor/compiler/style) using LangChain LCEL chain.
 
-    Uses build_review_chain() to construct: prompt | llm | parser
-    Tracing is handled by the parent hunk-level trace.
+    Streams `prompt | llm` via stream_review_comments(), which stops as soon as
+    the JSON array closes. `chain_input` comes from prepare_chain_input() and is shared by all passes
+    of a hunk. Tracing is handled by the parent hunk-level trace.
     """
-    chain_input = prepare_chain_input(file_path, hunk, mappings)
     logger.debug(f"{model_type.title()} pass: model={model_name}")
 
-    chain = build_review_chain(model_type, model=model_name)
-    
-    try:
-        comments = chain.invoke(chain_input)
-    except Exception as e:
-        logger.error(f"{model_type} pass: chain invoke failed: {e}")
-        return [], set()
-    
-    logger.info(f"{model_type} pass: LLM returned {len(comments)} raw comment(s)")
+    cache_key = make_review_cache_key(
+        model_type, model_name, get_prompt_version(model_type, model_name), chain_input
+    )
+    comments = _review_cache.get(cache_key)
+    if comments is not None:
+        logger.info(f"{model_type} pass: cache hit, reusing {len(comments)} raw comment(s)")
+    else:
+        try:
+            comments, complete = stream_review_comments(model_type, chain_input, model=model_name)
+        except Exception as e:
+            logger.error(f"{model_type} pass: chain stream failed: {e}")
+            return [], set()
+
+        # Only cache when the JSON array was the whole response; a truncated, trailing
+        # or fallback-parsed generation would otherwise be replayed on every re-run
+        # until it expires
+        if complete:
+            _review_cache.put(cache_key, comments)
+        logger.info(f"{model_type} pass: LLM returned {len(comments)} raw comment(s)")
 
     out_comments: List[Dict[str, Any]] = []
     accepted: Set[int] = set()
@@ -387,31 +456,12 @@ def _run_review_pass(
             logger.debug(f"Skip({model_type}): invalid target_id={llm_comment.target_id} or not added line")
             continue
 
-        line_no = m.target_line_no
-        head_ok = assert_head_alignment(head_sha, file_path, m, head_blob_cache)
-        if head_ok is False:
-            logger.debug(f"Align mismatch at ~{line_no}, trying nearby align...")
-            try:
-                center_index = next(i for i, mm in enumerate(mappings) if mm.target_id == m.target_id)
-            except StopIteration:
-                center_index = None
-            prev_ctx: List[str] = []
-            next_ctx: List[str] = []
-            if center_index is not None:
-                prev_ctx, next_ctx = _collect_target_side_context(mappings, center_index, max_depth=2)
-
-            aligned = try_nearby_align(
-                head_sha,
-                file_path,
-                m,
-                head_blob_cache,
-                prev_context=prev_ctx,
-                next_context=next_ctx,
-            )
-            if aligned is None:
-                logger.debug(f"Skip({model_type}): nearby align failed")
-                continue
-            line_no = aligned
+        line_no = resolve_line_no(
+            head_sha, file_path, m, mappings, head_norm_cache, head_index_cache
+        )
+        if line_no is None:
+            logger.debug(f"Skip({model_type}): HEAD alignment failed")
+            continue
 
         tag = PASS_TAG.get(model_type, "")
         final_comment = GitHubComment(
@@ -524,25 +574,14 @@ def generate_review_comments(request: ReviewRequest) -> List[Dict[str, Any]]:
     
     All tracing is scoped to a PR-specific LangSmith project.
     """
-    import os
-    
     logger.info(f"Start review PR=#{request.pull_request_number} {request.base_sha}..{request.head_sha}")
     
     pr_project_name = f"escargot-review-bot/PR-{request.pull_request_number}"
-    
-    # 환경변수를 동적으로 변경하여 LangChain 자동 트레이싱도 PR별 프로젝트로 보냄
-    old_project = os.environ.get("LANGCHAIN_PROJECT")
-    os.environ["LANGCHAIN_PROJECT"] = pr_project_name
-    
-    try:
-        with ls.tracing_context(project_name=pr_project_name):
-            return _execute_review(request)
-    finally:
-        # 원래 값 복원
-        if old_project is not None:
-            os.environ["LANGCHAIN_PROJECT"] = old_project
-        else:
-            os.environ.pop("LANGCHAIN_PROJECT", None)
+
+    # tracing_context는 contextvar 기반이라 동시 리뷰 요청 간에 프로젝트가 섞이지 않음
+    # (프로세스 전역인 LANGCHAIN_PROJECT 환경변수는 변경하지 않음)
+    with ls.tracing_context(project_name=pr_project_name):
+        return _execute_review(request)
 
 
 def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
@@ -556,7 +595,7 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
     diff_text = run_git_command([
         "diff", "--no-color", "--no-ext-diff", "--text",
         f"-U{DIFF_CONTEXT}", request.base_sha, request.head_sha
-    ])
+    ]).decode("utf-8", "replace")
     diff_text = diff_text.replace("\r\n", "\n")
     if not diff_text.endswith("\n"):
         diff_text += "\n"
@@ -572,25 +611,16 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
         logger.exception(f"Diff parse failed: {e}")
         return []
 
-    head_blob_cache: Dict[str, List[str]] = {}
-    for patched_file in patch_set:
-        file_path = patched_file.path
-        if not any(file_path.startswith(p) for p in REVIEW_INCLUDE_PATHS):
-            continue
-        key = f"{request.head_sha}:{file_path}"
-        if key not in head_blob_cache:
-            try:
-                blob_text = run_git_command(["show", f"{request.head_sha}:{file_path}"])
-                head_blob_cache[key] = blob_text.splitlines()
-            except Exception as e:
-                logger.debug(f"Could not load blob {key}: {e}")
-                head_blob_cache[key] = []
-
+    # Single pass over the diff: collect reviewable hunks and record which HEAD
+    # blobs to prefill.
+    head_paths: List[str] = []
     hunk_items: List[Tuple[str, Hunk, List[LineMappingLite], Dict[int, Any]]] = []
     for patched_file in patch_set:
         file_path = patched_file.path
-        if not any(file_path.startswith(p) for p in REVIEW_INCLUDE_PATHS):
+        if not file_path.startswith(_INCLUDE_PREFIXES):
             continue
+        if file_path not in head_paths:
+            head_paths.append(file_path)
         for hunk in patched_file:
             mappings = create_line_mappings_for_hunk(hunk)
             if not mappings:
@@ -598,6 +628,46 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
             mapping_dict = {m.target_id: m for m in mappings}
             hunk_items.append((file_path, hunk, mappings, mapping_dict))
 
+    # Load every reviewed HEAD blob up front: reuse entries from earlier requests and
+    # read the rest in one pipelined `git cat-file --batch` round. Lines are normalized
+    # and indexed once; alignment checks only read from these caches.
+    head_norm_cache: Dict[str, List[str]] = {}
+    head_index_cache: Dict[str, Dict[str, List[int]]] = {}
+    use_shared_cache = _FULL_OID_RE.fullmatch(request.head_sha) is not None
+    missing_paths: List[str] = []
+    for file_path in head_paths:
+        key = f"{request.head_sha}:{file_path}"
+        cached = _head_lines_cache.get(key) if use_shared_cache else None
+        if cached is None:
+            missing_paths.append(file_path)
+            continue
+        head_norm_cache[key], head_index_cache[key] = cached
+
+    try:
+        head_blobs = read_blobs(request.head_sha, missing_paths)
+        cacheable = use_shared_cache
+    except Exception as e:
+        logger.warning(f"Could not load HEAD blobs (alignment will fail): {e}")
+        head_blobs = [None] * len(missing_paths)
+        cacheable = False
+
+    for file_path, blob in zip(missing_paths, head_blobs):
+        key = f"{request.head_sha}:{file_path}"
+        if blob is None:
+            logger.debug(f"Could not load blob {key}")
+            norm_lines: List[str] = []
+        else:
+            blob_text = blob.decode("utf-8", "replace")
+            norm_lines = [normalize_for_compare(l) for l in blob_text.splitlines()]
+        head_norm_cache[key] = norm_lines
+        head_index_cache[key] = build_line_index(norm_lines)
+        if cacheable:
+            # A path absent at HEAD (deleted file) stays absent for that SHA
+            _head_lines_cache.put(key, (norm_lines, head_index_cache[key]))
+    logger.debug(
+        f"HEAD blobs: {len(head_paths) - len(missing_paths)} cached, {len(missing_paths)} loaded"
+    )
+
     if not hunk_items:
         logger.info("No hunks to review.")
         return []
@@ -619,8 +689,8 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
         )
         logger.info(
             f"Parallel passes enabled: [{models_info}], "
-            f"{len(hunk_items)} hunks × 4 passes = {4 * len(hunk_items)} tasks, "
-            f"max_workers={min(4 * workers, 4 * len(hunk_items))}."
+            f"{len(hunk_items)} hunk tasks (defect→refactor→compiler→style per task), "
+            f"max_workers={min(workers, len(hunk_items))}."
         )
     else:
         logger.info(f"Sequential review: {len(hunk_items)} hunks, {workers} workers per pass.")
@@ -655,34 +725,41 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
                 "target_length": h.target_length,
             },
         ) as hunk_run:
+            # Hunk text and commentable catalog are identical for every pass
+            chain_input = prepare_chain_input(fp, h, m)
+
             defect_comments, defect_ids = _run_review_pass(
                 model_type="defect",
                 model_name=OLLAMA_MODEL_DEFECT,
-                file_path=fp, hunk=h, mappings=m, mapping_dict=md,
-                head_sha=request.head_sha, head_blob_cache=head_blob_cache,
+                file_path=fp, chain_input=chain_input, mappings=m, mapping_dict=md,
+                head_sha=request.head_sha, head_norm_cache=head_norm_cache,
+                head_index_cache=head_index_cache,
             )
             
             refactor_comments, refactor_ids = _run_review_pass(
                 model_type="refactor",
                 model_name=OLLAMA_MODEL_REFACTOR,
-                file_path=fp, hunk=h, mappings=m, mapping_dict=md,
-                head_sha=request.head_sha, head_blob_cache=head_blob_cache,
+                file_path=fp, chain_input=chain_input, mappings=m, mapping_dict=md,
+                head_sha=request.head_sha, head_norm_cache=head_norm_cache,
+                head_index_cache=head_index_cache,
                 skip_ids=defect_ids,
             )
             
             compiler_comments, _ = _run_review_pass(
                 model_type="compiler",
                 model_name=OLLAMA_MODEL_COMPILER,
-                file_path=fp, hunk=h, mappings=m, mapping_dict=md,
-                head_sha=request.head_sha, head_blob_cache=head_blob_cache,
+                file_path=fp, chain_input=chain_input, mappings=m, mapping_dict=md,
+                head_sha=request.head_sha, head_norm_cache=head_norm_cache,
+                head_index_cache=head_index_cache,
                 skip_ids=defect_ids | refactor_ids,
             )
             
             style_comments, _ = _run_review_pass(
                 model_type="style",
                 model_name=OLLAMA_MODEL_STYLE,
-                file_path=fp, hunk=h, mappings=m, mapping_dict=md,
-                head_sha=request.head_sha, head_blob_cache=head_blob_cache,
+                file_path=fp, chain_input=chain_input, mappings=m, mapping_dict=md,
+                head_sha=request.head_sha, head_norm_cache=head_norm_cache,
+                head_index_cache=head_index_cache,
                 skip_ids=defect_ids | refactor_ids,
             )
             
@@ -704,27 +781,34 @@ def _execute_review(request: ReviewRequest) -> List[Dict[str, Any]]:
             
             return merged
 
-    all_github_comments: List[Dict[str, Any]] = []
-    
+    # Per-hunk results, filled by index so the output keeps diff order
+    hunk_results: List[List[Dict[str, Any]]] = [[] for _ in hunk_items]
+
     if use_parallel_passes:
+        # One pipelined task per hunk: a fast hunk moves on to its next pass while
+        # a slow one is still in defect, with no barrier between passes.
         with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Run each task in a copy of this context so worker threads inherit the
+            # PR-scoped tracing_context (contextvars do not cross threads on their own)
             future_to_idx = {
-                executor.submit(run_single_hunk, i): i
+                executor.submit(contextvars.copy_context().run, run_single_hunk, i): i
                 for i in range(len(hunk_items))
             }
             for future in as_completed(future_to_idx):
                 hunk_idx = future_to_idx[future]
                 try:
-                    all_github_comments.extend(future.result())
+                    hunk_results[hunk_idx] = future.result()
                 except Exception as e:
                     logger.exception(f"Hunk {hunk_idx} review failed: {e}")
     else:
         for i in range(len(hunk_items)):
             try:
-                all_github_comments.extend(run_single_hunk(i))
+                hunk_results[i] = run_single_hunk(i)
             except Exception as e:
                 logger.exception(f"Hunk {i} review failed: {e}")
 
+    all_github_comments: List[Dict[str, Any]] = list(itertools.chain.from_iterable(hunk_results))
+
     logger.info(f"Generated {len(all_github_comments)} comments (hunks={len(hunk_items)}, parallel={use_parallel_passes}).")
     return all_github_comments
 